@@ -5,22 +5,115 @@ Provides information about databases, measurements, and data points.
 """
 
 import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
 from influxdb import InfluxDBClient
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
-def get_databases(client):
-    """Get list of databases from InfluxDB."""
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Number of concurrent measurement queries issued by --detailed
+DEFAULT_WORKERS = 8
+
+# Database/measurement listings cached by --cache-ttl
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'influxdb_stats')
+
+
+def make_session():
+    """Create a keep-alive HTTP session to share between clients.
+
+    Sharing one session across every client means each query reuses an
+    established connection instead of paying a new TCP/TLS handshake.
+    Pass it to InfluxDBClient as ``session=``; the client mounts its own
+    connection pool (sized by ``pool_size``) and retries failed requests
+    itself, so no adapter is mounted here.
+    """
+    session = requests.Session()
+    session.headers['Connection'] = 'keep-alive'
+    return session
+
+
+def _cache_path(cache_key, name):
+    """Return the cache file for listing *name* under *cache_key*."""
+    key = f"{cache_key}:{name}"
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+
+def _read_cache(path, ttl):
+    """Return the cached value at *path* if younger than *ttl* seconds."""
+    if ttl <= 0:
+        return None
+    try:
+        if os.path.getmtime(path) <= time.time() - ttl:
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, value):
+    """Atomically write *value* to the cache file at *path*."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write cache {path}: {e}", file=sys.stderr)
+
+
+def get_databases(client, cache_ttl=0, cache_key=''):
+    """Get list of user databases from InfluxDB.
+
+    Internal databases (``_internal``, ``_monitor``, ...) are left out.
+    With a positive *cache_ttl* (seconds) the listing is served from a
+    local cache when fresh enough.  *cache_key* names the server and user
+    the listing belongs to, since users with different privileges see
+    different databases.
+    """
+    cache_path = _cache_path(cache_key, '')
+    cached = _read_cache(cache_path, cache_ttl)
+    if cached is not None:
+        return cached
     try:
         databases = client.get_list_database()
-        return [db['name'] for db in databases]
+        names = [db['name'] for db in databases if not db['name'].startswith('_')]
     except Exception as e:
         print(f"Error getting databases: {e}", file=sys.stderr)
         return []
+    if cache_ttl > 0:
+        _write_cache(cache_path, names)
+    return names
+
 
+def get_measurements(client, database, cache_ttl=0, cache_key=''):
+    """Get list of measurements for a database.
 
-def get_measurements(client, database):
-    """Get list of measurements for a database."""
+    With a positive *cache_ttl* (seconds) the listing is served from a
+    local cache when fresh enough, keyed as in get_databases().
+    """
+    cache_path = _cache_path(cache_key, database)
+    cached = _read_cache(cache_path, cache_ttl)
+    if cached is not None:
+        return cached
     try:
         client.switch_database(database)
         result = client.query('SHOW MEASUREMENTS')
@@ -28,84 +121,196 @@ def get_measurements(client, database):
         if result:
             for item in result.get_points():
                 measurements.append(item['name'])
-        return measurements
     except Exception as e:
         print(f"Error getting measurements for {database}: {e}", file=sys.stderr)
         return []
+    if cache_ttl > 0:
+        _write_cache(cache_path, measurements)
+    return measurements
 
 
-def get_measurement_stats(client, database, measurement):
-    """Get statistics for a specific measurement."""
+def _stats_query(measurement, exact=False):
+    """Build the multi-statement query used by get_measurement_stats.
+
+    InfluxDB returns one result set per semicolon-separated statement, so
+    the count and time range are fetched in a single round-trip.
+    """
+    if exact:
+        count_query = f'SELECT COUNT(*) FROM "{measurement}"'
+    else:
+        count_query = f'SHOW SERIES CARDINALITY FROM "{measurement}"'
+    return (
+        f'{count_query}; '
+        f'SELECT * FROM "{measurement}" ORDER BY time ASC LIMIT 1; '
+        f'SELECT * FROM "{measurement}" ORDER BY time DESC LIMIT 1'
+    )
+
+
+def _stats_from_points(count_point, first_point, last_point):
+    """Build the stats dict from the first point of each result set."""
+    # Count of the first field (or the series cardinality)
+    count = next((value for key, value in count_point.items()
+                  if key != 'time' and value is not None), 0)
+    return {
+        'count': count,
+        'first_time': first_point.get('time'),
+        'last_time': last_point.get('time')
+    }
+
+
+def get_measurement_stats(client, database, measurement, exact=False):
+    """Get statistics for a specific measurement.
+
+    By default the count is the measurement's series cardinality, which
+    InfluxDB answers from its index.  With *exact* the count is the number
+    of points, which requires scanning every shard of the measurement.
+    """
     try:
         client.switch_database(database)
-        
-        # Get count of points
-        count_query = f'SELECT COUNT(*) FROM "{measurement}"'
-        count_result = client.query(count_query)
-        count = 0
-        for point in count_result.get_points():
-            # Get the first value from the point (count of first field)
-            for key, value in point.items():
-                if key != 'time' and value is not None:
-                    count = value
-                    break
-        
-        # Get time range
-        time_query = f'SELECT * FROM "{measurement}" ORDER BY time ASC LIMIT 1'
-        first_result = client.query(time_query)
-        first_time = None
-        for point in first_result.get_points():
-            first_time = point.get('time')
-            break
-        
-        time_query = f'SELECT * FROM "{measurement}" ORDER BY time DESC LIMIT 1'
-        last_result = client.query(time_query)
-        last_time = None
-        for point in last_result.get_points():
-            last_time = point.get('time')
-            break
-        
-        return {
-            'count': count,
-            'first_time': first_time,
-            'last_time': last_time
-        }
+        results = client.query(_stats_query(measurement, exact))
+        # Only the first point of each result set is needed
+        return _stats_from_points(*(next(iter(result.get_points()), {})
+                                    for result in results))
     except Exception as e:
         print(f"Error getting stats for {measurement}: {e}", file=sys.stderr)
         return None
 
 
-def print_stats(client, detailed=False):
-    """Print statistics for InfluxDB instance."""
-    databases = get_databases(client)
+def collect_measurement_stats(client_factory, tasks, max_workers=DEFAULT_WORKERS,
+                              exact=False):
+    """Fetch stats for (database, measurement) pairs concurrently.
+
+    Queries are network-bound, so they are dispatched over a bounded thread
+    pool.  ``switch_database`` mutates client state, so every worker thread
+    gets its own client from *client_factory*.
+
+    Returns a dict mapping each (database, measurement) task to its stats.
+    """
+    local = threading.local()
+
+    def worker(task):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = client_factory()
+        return get_measurement_stats(client, *task, exact=exact)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return dict(zip(tasks, executor.map(worker, tasks)))
+
+
+def _first_point(result):
+    """Return the first row of a raw /query result as a column->value dict."""
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    for series in result.get('series', []):
+        for values in series.get('values', []):
+            return dict(zip(series['columns'], values))
+    return {}
+
+
+async def _fetch_measurement_stats(session, url, database, measurement, exact):
+    """Fetch stats for one measurement from the HTTP /query endpoint."""
+    params = {'db': database, 'q': _stats_query(measurement, exact)}
+    async with session.get(url, params=params) as response:
+        response.raise_for_status()
+        data = _json_loads(await response.read())
+    # A request that fails as a whole reports one top-level error instead
+    # of per-statement results
+    if 'error' in data:
+        raise RuntimeError(data['error'])
+    return _stats_from_points(*(_first_point(result)
+                                for result in data.get('results', [])))
+
+
+async def _collect_measurement_stats_async(url, username, password, tasks,
+                                           max_workers, exact):
+    """Run every stats query concurrently on one aiohttp session."""
+    connector = aiohttp.TCPConnector(limit=max(1, max_workers))
+    auth = aiohttp.BasicAuth(username, password) if username else None
+    async with aiohttp.ClientSession(connector=connector, auth=auth) as session:
+        results = await asyncio.gather(
+            *(_fetch_measurement_stats(session, url, db, m, exact)
+              for db, m in tasks),
+            return_exceptions=True)
+
+    stats = {}
+    for (db, measurement), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            print(f"Error getting stats for {measurement}: {result}", file=sys.stderr)
+            result = None
+        stats[(db, measurement)] = result
+    return stats
+
+
+def collect_measurement_stats_async(url, username, password, tasks,
+                                    max_workers=DEFAULT_WORKERS, exact=False):
+    """Fetch stats for (database, measurement) pairs on one event loop.
+
+    Queries go straight to the InfluxDB /query endpoint at *url* through
+    aiohttp, with at most *max_workers* requests in flight.  Requires the
+    optional aiohttp package.
+
+    Returns a dict mapping each (database, measurement) task to its stats.
+    """
+    return asyncio.run(_collect_measurement_stats_async(
+        url, username, password, tasks, max_workers, exact))
+
+
+def print_stats(client, detailed=False, client_factory=None,
+                max_workers=DEFAULT_WORKERS, exact=False, cache_ttl=0,
+                stats_fetcher=None, cache_key=''):
+    """Print statistics for InfluxDB instance.
+
+    When *client_factory* is given, detailed measurement stats are fetched
+    in parallel with one client per worker thread; otherwise they are
+    fetched serially with *client*.  *stats_fetcher*, if given, replaces
+    both: it is called with the list of (database, measurement) tasks and
+    must return a dict of stats per task.  A positive *cache_ttl* serves
+    the database and measurement listings from a local cache under
+    *cache_key*.
+    """
+    databases = get_databases(client, cache_ttl=cache_ttl, cache_key=cache_key)
     
     if not databases:
         print("No databases found or unable to connect.")
         return
     
+    measurements_by_db = {db: get_measurements(client, db, cache_ttl=cache_ttl,
+                                               cache_key=cache_key)
+                          for db in databases}
+
+    stats = {}
+    if detailed:
+        tasks = [(db, m) for db, measurements in measurements_by_db.items()
+                 for m in measurements]
+        if stats_fetcher is not None:
+            stats = stats_fetcher(tasks)
+        else:
+            if client_factory is None:
+                client_factory, max_workers = (lambda: client), 1
+            stats = collect_measurement_stats(client_factory, tasks, max_workers,
+                                              exact=exact)
+
     print("=" * 80)
     print("InfluxDB Instance Statistics")
     print("=" * 80)
     print(f"\nTotal Databases: {len(databases)}")
     print("-" * 80)
     
-    for db in databases:
-        if db.startswith('_'):  # Skip internal databases
-            continue
-            
+    for db, measurements in measurements_by_db.items():
         print(f"\nDatabase: {db}")
-        measurements = get_measurements(client, db)
         print(f"  Measurements: {len(measurements)}")
         
         if detailed and measurements:
             print(f"  Measurement details:")
             for measurement in measurements:
-                stats = get_measurement_stats(client, db, measurement)
-                if stats:
+                stats_for = stats.get((db, measurement))
+                if stats_for:
                     print(f"    - {measurement}:")
-                    print(f"        Points: {stats['count']}")
-                    if stats['first_time'] and stats['last_time']:
-                        print(f"        Time range: {stats['first_time']} to {stats['last_time']}")
+                    label = 'Points' if exact else 'Series'
+                    print(f"        {label}: {stats_for['count']}")
+                    if stats_for['first_time'] and stats_for['last_time']:
+                        print(f"        Time range: {stats_for['first_time']} to {stats_for['last_time']}")
     
     print("\n" + "=" * 80)
 
@@ -135,26 +340,63 @@ Examples:
                         help='Specific database to query (default: all databases)')
     parser.add_argument('--detailed', action='store_true',
                         help='Show detailed statistics including measurement counts')
+    parser.add_argument('--exact', action='store_true',
+                        help='With --detailed, count points with SELECT COUNT(*) '
+                             'instead of reporting series cardinality')
+    parser.add_argument('--cache-ttl', type=int, default=0,
+                        help='Cache database/measurement listings for N seconds '
+                             '(default: 0, disabled)')
     parser.add_argument('--ssl', action='store_true',
                         help='Use SSL connection')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Concurrent queries for --detailed '
+                             f'(default: {DEFAULT_WORKERS})')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Fetch --detailed stats concurrently with asyncio '
+                             '(requires aiohttp)')
     
     args = parser.parse_args()
+
+    base_url = f"{'https' if args.ssl else 'http'}://{args.host}:{args.port}"
+
+    stats_fetcher = None
+    if args.use_async:
+        if aiohttp is None:
+            print("Error: --async requires the aiohttp package", file=sys.stderr)
+            sys.exit(1)
+        stats_fetcher = functools.partial(
+            collect_measurement_stats_async,
+            f"{base_url}/query",
+            args.user, args.password,
+            max_workers=args.workers, exact=args.exact)
     
-    try:
-        # Create InfluxDB client
-        client = InfluxDBClient(
+    # One pooled session shared by the main client and all worker clients
+    session = make_session()
+
+    def make_client():
+        return InfluxDBClient(
             host=args.host,
             port=args.port,
             username=args.user,
             password=args.password,
             ssl=args.ssl,
-            verify_ssl=args.ssl
+            verify_ssl=args.ssl,
+            pool_size=max(1, args.workers),
+            session=session
         )
+
+    try:
+        # Create InfluxDB client
+        client = make_client()
         
         # Test connection
         client.ping()
         
-        print_stats(client, detailed=args.detailed)
+        print_stats(client, detailed=args.detailed,
+                    client_factory=make_client, max_workers=args.workers,
+                    exact=args.exact, cache_ttl=args.cache_ttl,
+                    stats_fetcher=stats_fetcher,
+                    cache_key=f"{args.user}@{base_url}")
         
     except Exception as e:
         print(f"Error connecting to InfluxDB: {e}", file=sys.stderr)
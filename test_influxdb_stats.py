@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""Tests for influxdb_stats.py"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import influxdb_stats
+from influxdb_stats import (
+    _first_point,
+    _read_cache,
+    _stats_from_points,
+    _stats_query,
+    _write_cache,
+    collect_measurement_stats,
+    collect_measurement_stats_async,
+    get_databases,
+    get_measurement_stats,
+    print_stats,
+)
+
+
+class _Result:
+    """Stand-in for an influxdb ResultSet holding a list of points."""
+
+    def __init__(self, *points):
+        self.points = list(points)
+
+    def get_points(self):
+        return iter(self.points)
+
+    def __bool__(self):
+        return bool(self.points)
+
+
+class _Response:
+    """Stand-in for an aiohttp response returning a JSON *payload*."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _Session:
+    """Stand-in for an aiohttp ClientSession answering every GET with *payload*."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def get(self, url, params=None):
+        return _Response(self.payload)
+
+
+def _raw_payload(params):
+    """/query payload for a stats query; measurement 'gone' fails as a whole."""
+    measurement = params['q'].split('"')[1]
+    if measurement == 'gone':
+        return {'error': f"measurement not found: {measurement}"}
+    return {'results': [
+        {'series': [{'columns': ['count'], 'values': [[len(measurement)]]}]},
+        {'series': [{'columns': ['time'], 'values': [['2024-01-01T00:00:00Z']]}]},
+        {'series': [{'columns': ['time'], 'values': [['2024-02-01T00:00:00Z']]}]},
+    ]}
+
+
+class _ClientSession:
+    """Stand-in for aiohttp.ClientSession answering with _raw_payload()."""
+
+    def __init__(self, connector=None, auth=None):
+        self.connector = connector
+        self.auth = auth
+        self.requests = []
+
+    def get(self, url, params=None):
+        self.requests.append((url, params))
+        return _Response(_raw_payload(params))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'cache', 'listing.json')
+
+    def test_round_trip(self):
+        _write_cache(self.path, ["db1", "db2"])
+        self.assertEqual(_read_cache(self.path, 60), ["db1", "db2"])
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['listing.json'])
+
+    def test_disabled(self):
+        _write_cache(self.path, ["db1"])
+        self.assertIsNone(_read_cache(self.path, 0))
+
+    def test_expired(self):
+        _write_cache(self.path, ["db1"])
+        stale = time.time() - 120
+        os.utime(self.path, (stale, stale))
+        self.assertIsNone(_read_cache(self.path, 60))
+        self.assertEqual(_read_cache(self.path, 300), ["db1"])
+
+    def test_missing(self):
+        self.assertIsNone(_read_cache(self.path, 60))
+
+    def test_corrupt(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('["db1", ')
+        self.assertIsNone(_read_cache(self.path, 60))
+
+    def test_unwritable(self):
+        stderr = io.StringIO()
+        with mock.patch('influxdb_stats.os.makedirs',
+                        side_effect=PermissionError(13, "Permission denied")), \
+                contextlib.redirect_stderr(stderr):
+            _write_cache(self.path, ["db1"])
+        self.assertIn("could not write cache", stderr.getvalue())
+        self.assertIsNone(_read_cache(self.path, 60))
+
+    def test_get_databases_cached(self):
+        client = mock.Mock()
+        client.get_list_database.return_value = [{'name': 'db1'}, {'name': '_internal'}]
+        with mock.patch('influxdb_stats.CACHE_DIR', os.path.dirname(self.path)):
+            self.assertEqual(get_databases(client, cache_ttl=60,
+                                           cache_key='http://localhost:8086'), ['db1'])
+            self.assertEqual(get_databases(client, cache_ttl=60,
+                                           cache_key='http://localhost:8086'), ['db1'])
+        client.get_list_database.assert_called_once_with()
+
+    def test_get_databases_cached_per_key(self):
+        admin = mock.Mock()
+        admin.get_list_database.return_value = [{'name': 'db1'}, {'name': 'db2'}]
+        reader = mock.Mock()
+        reader.get_list_database.return_value = [{'name': 'db1'}]
+        with mock.patch('influxdb_stats.CACHE_DIR', os.path.dirname(self.path)):
+            self.assertEqual(get_databases(admin, cache_ttl=60,
+                                           cache_key='admin@http://localhost:8086'),
+                             ['db1', 'db2'])
+            self.assertEqual(get_databases(reader, cache_ttl=60,
+                                           cache_key='reader@http://localhost:8086'),
+                             ['db1'])
+            self.assertEqual(get_databases(reader, cache_ttl=60,
+                                           cache_key='reader@https://localhost:8086'),
+                             ['db1'])
+        self.assertEqual(reader.get_list_database.call_count, 2)
+
+
+class TestMeasurementStats(unittest.TestCase):
+
+    def test_query_statements(self):
+        self.assertEqual(_stats_query('cpu').count(';'), 2)
+        self.assertTrue(_stats_query('cpu').startswith('SHOW SERIES CARDINALITY'))
+        self.assertTrue(_stats_query('cpu', exact=True).startswith('SELECT COUNT(*)'))
+
+    def test_stats_from_points(self):
+        stats = _stats_from_points(
+            {'time': '1970-01-01T00:00:00Z', 'count_idle': None, 'count_user': 42},
+            {'time': '2024-01-01T00:00:00Z', 'user': 1.0},
+            {'time': '2024-02-01T00:00:00Z', 'user': 2.0})
+        self.assertEqual(stats, {'count': 42,
+                                 'first_time': '2024-01-01T00:00:00Z',
+                                 'last_time': '2024-02-01T00:00:00Z'})
+
+    def test_stats_from_empty_points(self):
+        self.assertEqual(_stats_from_points({}, {}, {}),
+                         {'count': 0, 'first_time': None, 'last_time': None})
+
+    def test_get_measurement_stats(self):
+        client = mock.Mock()
+        client.query.return_value = [
+            _Result({'count': 3}),
+            _Result({'time': '2024-01-01T00:00:00Z'}, {'time': '2024-01-02T00:00:00Z'}),
+            _Result({'time': '2024-02-01T00:00:00Z'}),
+        ]
+        stats = get_measurement_stats(client, 'mydb', 'cpu')
+        client.switch_database.assert_called_once_with('mydb')
+        client.query.assert_called_once_with(_stats_query('cpu'))
+        self.assertEqual(stats, {'count': 3,
+                                 'first_time': '2024-01-01T00:00:00Z',
+                                 'last_time': '2024-02-01T00:00:00Z'})
+
+    def test_get_measurement_stats_error(self):
+        client = mock.Mock()
+        client.query.side_effect = RuntimeError("timeout")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertIsNone(get_measurement_stats(client, 'mydb', 'cpu'))
+        self.assertIn("Error getting stats for cpu: timeout", stderr.getvalue())
+
+
+def _stats_client(fail=()):
+    """Mock client answering stats queries; measurements in *fail* raise."""
+    client = mock.Mock()
+    client.threads = set()
+
+    def query(q):
+        client.threads.add(threading.get_ident())
+        measurement = q.split('"')[1]
+        if measurement in fail:
+            raise RuntimeError(f"{measurement} timed out")
+        return [_Result({'count': len(measurement)}),
+                _Result({'time': '2024-01-01T00:00:00Z'}),
+                _Result({'time': '2024-02-01T00:00:00Z'})]
+
+    client.query.side_effect = query
+    return client
+
+
+class TestCollectMeasurementStats(unittest.TestCase):
+
+    tasks = [('db1', 'cpu'), ('db1', 'mem'), ('db2', 'disk'), ('db2', 'net')] * 5
+
+    def test_results_in_task_order(self):
+        tasks = [(db, f"{m}{i}") for i, (db, m) in enumerate(self.tasks)]
+        stats = collect_measurement_stats(_stats_client, tasks, max_workers=4)
+        self.assertEqual(list(stats), tasks)
+        for (db, measurement), stats_for in stats.items():
+            self.assertEqual(stats_for['count'], len(measurement))
+
+    def test_one_client_per_thread(self):
+        clients = []
+
+        def factory():
+            clients.append(_stats_client())
+            return clients[-1]
+
+        collect_measurement_stats(factory, self.tasks, max_workers=3)
+        self.assertLessEqual(len(clients), 3)
+        self.assertEqual(sum(c.query.call_count for c in clients), len(self.tasks))
+        for client in clients:
+            self.assertEqual(len(client.threads), 1)
+
+    def test_errors_leave_other_tasks(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            stats = collect_measurement_stats(
+                lambda: _stats_client(fail={'mem'}), self.tasks[:4], max_workers=2)
+        self.assertIsNone(stats[('db1', 'mem')])
+        self.assertEqual(stats[('db2', 'disk')]['count'], 4)
+        self.assertIn("Error getting stats for mem: mem timed out", stderr.getvalue())
+
+    def test_at_least_one_worker(self):
+        stats = collect_measurement_stats(_stats_client, self.tasks[:2], max_workers=0)
+        self.assertEqual(list(stats), self.tasks[:2])
+
+
+class TestPrintStats(unittest.TestCase):
+
+    def _client(self):
+        client = _stats_client()
+        client.get_list_database.return_value = [{'name': 'db1'}, {'name': '_internal'}]
+        client.query.side_effect = lambda q: (
+            _Result({'name': 'cpu'}, {'name': 'mem'})
+            if q == 'SHOW MEASUREMENTS' else _stats_client().query(q))
+        return client
+
+    def _print(self, *args, **kwargs):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            print_stats(*args, **kwargs)
+        return stdout.getvalue()
+
+    def test_summary(self):
+        output = self._print(self._client())
+        self.assertIn("Total Databases: 1", output)
+        self.assertIn("Database: db1\n  Measurements: 2", output)
+        self.assertNotIn("Measurement details", output)
+
+    def test_detailed_serial(self):
+        output = self._print(self._client(), detailed=True)
+        self.assertIn("    - cpu:\n        Series: 3\n"
+                      "        Time range: 2024-01-01T00:00:00Z to 2024-02-01T00:00:00Z",
+                      output)
+        self.assertIn("    - mem:\n        Series: 3", output)
+
+    def test_detailed_parallel(self):
+        factory = mock.Mock(side_effect=_stats_client)
+        output = self._print(self._client(), detailed=True, exact=True,
+                             client_factory=factory, max_workers=2)
+        self.assertTrue(1 <= factory.call_count <= 2)
+        self.assertIn("    - cpu:\n        Points: 3", output)
+
+    def test_stats_fetcher(self):
+        fetcher = mock.Mock(return_value={
+            ('db1', 'cpu'): {'count': 9, 'first_time': None, 'last_time': None},
+            ('db1', 'mem'): None})
+        factory = mock.Mock()
+        output = self._print(self._client(), detailed=True,
+                             client_factory=factory, stats_fetcher=fetcher)
+        fetcher.assert_called_once_with([('db1', 'cpu'), ('db1', 'mem')])
+        factory.assert_not_called()
+        self.assertIn("    - cpu:\n        Series: 9\n", output)
+        self.assertNotIn("    - mem:", output)
+
+    def test_no_databases(self):
+        client = mock.Mock()
+        client.get_list_database.return_value = []
+        self.assertIn("No databases found", self._print(client))
+
+
+class TestCollectMeasurementStatsAsync(unittest.TestCase):
+
+    def setUp(self):
+        self.sessions = []
+
+        def client_session(**kwargs):
+            self.sessions.append(_ClientSession(**kwargs))
+            return self.sessions[-1]
+
+        patcher = mock.patch('influxdb_stats.aiohttp', mock.Mock(
+            ClientSession=client_session,
+            TCPConnector=lambda limit: ('connector', limit),
+            BasicAuth=lambda user, password: (user, password)))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_in_task_order(self):
+        tasks = [('db1', 'cpu'), ('db2', 'memory'), ('db1', 'io')]
+        stats = collect_measurement_stats_async(
+            'http://localhost:8086/query', '', '', tasks, max_workers=2)
+        self.assertEqual(list(stats), tasks)
+        self.assertEqual([s['count'] for s in stats.values()], [3, 6, 2])
+        self.assertEqual(stats[('db1', 'io')]['last_time'], '2024-02-01T00:00:00Z')
+        session, = self.sessions
+        self.assertEqual(session.connector, ('connector', 2))
+        self.assertIsNone(session.auth)
+        self.assertEqual([params['db'] for _, params in session.requests],
+                         ['db1', 'db2', 'db1'])
+
+    def test_errors_leave_other_tasks(self):
+        tasks = [('db1', 'cpu'), ('db1', 'gone')]
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            stats = collect_measurement_stats_async(
+                'http://localhost:8086/query', 'admin', 'secret', tasks, exact=True)
+        self.assertIsNone(stats[('db1', 'gone')])
+        self.assertEqual(stats[('db1', 'cpu')]['count'], 3)
+        self.assertIn("Error getting stats for gone: measurement not found: gone",
+                      stderr.getvalue())
+        session, = self.sessions
+        self.assertEqual(session.auth, ('admin', 'secret'))
+        self.assertTrue(session.requests[0][1]['q'].startswith('SELECT COUNT(*)'))
+
+
+class TestMain(unittest.TestCase):
+
+    def _main(self, *argv):
+        with mock.patch('sys.argv', ['influxdb_stats.py', *argv]), \
+                mock.patch('influxdb_stats.InfluxDBClient') as client_cls, \
+                mock.patch('influxdb_stats.print_stats') as print_stats_mock:
+            influxdb_stats.main()
+        return client_cls, print_stats_mock
+
+    def test_workers(self):
+        client_cls, print_stats_mock = self._main('--detailed', '--workers', '3')
+        self.assertEqual(client_cls.call_args.kwargs['pool_size'], 3)
+        kwargs = print_stats_mock.call_args.kwargs
+        self.assertEqual(kwargs['max_workers'], 3)
+        self.assertTrue(kwargs['detailed'])
+        # Worker clients share the main client's session
+        kwargs['client_factory']()
+        sessions = {call.kwargs['session'] for call in client_cls.call_args_list}
+        self.assertEqual(len(sessions), 1)
+        self.assertIsNone(kwargs['stats_fetcher'])
+
+    def test_cache_key(self):
+        _, print_stats_mock = self._main('--cache-ttl', '60', '--ssl',
+                                         '--host', 'db.example.com', '--user', 'reader')
+        kwargs = print_stats_mock.call_args.kwargs
+        self.assertEqual(kwargs['cache_ttl'], 60)
+        self.assertEqual(kwargs['cache_key'], 'reader@https://db.example.com:8086')
+
+    def test_async(self):
+        with mock.patch('influxdb_stats.aiohttp', mock.Mock()):
+            _, print_stats_mock = self._main(
+                '--detailed', '--async', '--ssl', '--host', 'db.example.com',
+                '--user', 'admin', '--password', 'secret', '--workers', '5', '--exact')
+        fetcher = print_stats_mock.call_args.kwargs['stats_fetcher']
+        self.assertIs(fetcher.func, collect_measurement_stats_async)
+        self.assertEqual(fetcher.args,
+                         ('https://db.example.com:8086/query', 'admin', 'secret'))
+        self.assertEqual(fetcher.keywords, {'max_workers': 5, 'exact': True})
+
+    def test_async_requires_aiohttp(self):
+        stderr = io.StringIO()
+        with mock.patch('influxdb_stats.aiohttp', None), \
+                contextlib.redirect_stderr(stderr), \
+                self.assertRaises(SystemExit) as cm:
+            self._main('--detailed', '--async')
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("--async requires the aiohttp package", stderr.getvalue())
+
+
+class TestRawQueryStats(unittest.TestCase):
+
+    def _fetch(self, payload):
+        return asyncio.run(influxdb_stats._fetch_measurement_stats(
+            _Session(payload), 'http://localhost:8086/query', 'mydb', 'cpu', False))
+
+    def test_first_point(self):
+        result = {'series': [{'columns': ['time', 'count'],
+                              'values': [['1970-01-01T00:00:00Z', 5]]}]}
+        self.assertEqual(_first_point(result),
+                         {'time': '1970-01-01T00:00:00Z', 'count': 5})
+        self.assertEqual(_first_point({'statement_id': 0}), {})
+
+    def test_first_point_statement_error(self):
+        with self.assertRaisesRegex(RuntimeError, "measurement not found"):
+            _first_point({'statement_id': 0, 'error': 'measurement not found'})
+
+    def test_fetch(self):
+        stats = self._fetch({'results': [
+            {'series': [{'columns': ['count'], 'values': [[7]]}]},
+            {'series': [{'columns': ['time', 'v'], 'values': [['2024-01-01T00:00:00Z', 1]]}]},
+            {'series': [{'columns': ['time', 'v'], 'values': [['2024-02-01T00:00:00Z', 2]]}]},
+        ]})
+        self.assertEqual(stats, {'count': 7,
+                                 'first_time': '2024-01-01T00:00:00Z',
+                                 'last_time': '2024-02-01T00:00:00Z'})
+
+    def test_fetch_top_level_error(self):
+        with self.assertRaisesRegex(RuntimeError, "database not found: mydb"):
+            self._fetch({'error': 'database not found: mydb'})
+
+
+if __name__ == '__main__':
+    unittest.main()
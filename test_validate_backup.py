@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 """Tests for validate_backup.py"""
 
+import bz2
+import contextlib
+import gzip
 import io
 import json
+import lzma
 import os
 import tarfile
 import tempfile
 import unittest
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from unittest import mock
 
+import validate_backup
 from validate_backup import (
+    KIND_MANIFEST,
+    KIND_META,
+    KIND_SHARD,
+    classify,
     is_meta_file,
     is_shard_file,
     is_manifest_file,
@@ -19,6 +29,10 @@ from validate_backup import (
     validate_backup_archive,
 )
 
+# Shared zero-filled buffer; slices of the memoryview are written without
+# allocating a new bytes object per fixture file.
+_ZEROS = memoryview(bytes(1 << 16))
+
 
 class TestIsMetaFile(unittest.TestCase):
     """Tests for the is_meta_file helper."""
@@ -77,6 +91,13 @@ class TestIsShardFile(unittest.TestCase):
         self.assertFalse(is_shard_file("manifest"))
         self.assertFalse(is_shard_file("bolt"))
 
+    def test_shard_data_files(self):
+        """2.x shard data inside shard directories is not a shard backup."""
+        for name in ("1234/000000001-000000001.tsm", "1234/index/L0-00000001.tsi",
+                     "1234/_series/00/0000.idx", "wal/1234/_00001.wal"):
+            self.assertFalse(is_shard_file(name), name)
+            self.assertFalse(is_meta_file(name), name)
+
 
 class TestIsManifestFile(unittest.TestCase):
     """Tests for the is_manifest_file helper."""
@@ -95,37 +116,210 @@ class TestIsManifestFile(unittest.TestCase):
         self.assertFalse(is_manifest_file("meta.00"))
         self.assertFalse(is_manifest_file("data.tsm"))
 
+    def test_portable_manifest_needs_a_stem(self):
+        self.assertTrue(is_manifest_file("backup/ab.manifest"))
+        self.assertFalse(is_manifest_file("x.manifest"))
+        self.assertFalse(is_manifest_file(".manifest"))
+        self.assertFalse(is_manifest_file("manifest.json.bak"))
+
+
+class TestClassify(unittest.TestCase):
+    """Tests for the combined classify helper."""
+
+    def test_kinds(self):
+        self.assertEqual(classify("manifest.json"), KIND_MANIFEST)
+        self.assertEqual(classify("20220214T120000Z.manifest"), KIND_MANIFEST)
+        self.assertEqual(classify("meta.00"), KIND_META)
+        self.assertEqual(classify("20240212T140100Z.bolt.gz"), KIND_META)
+        self.assertEqual(classify("mydb.autogen.00001.00"), KIND_SHARD)
+        self.assertEqual(classify("20260212T025958Z.1.tar.gz"), KIND_SHARD)
+
+    def test_unclassified(self):
+        self.assertIsNone(classify("000000001.tsm"))
+        self.assertIsNone(classify("1234/index/L0-00000001.tsi"))
+        self.assertIsNone(classify("_series/00/0000"))
+        self.assertIsNone(classify("x.bolt"))
+
+    def test_uses_basename(self):
+        self.assertEqual(classify("backup/1234/meta.00"), KIND_META)
+
+    def test_agrees_with_predicates(self):
+        """The combined pattern classifies exactly like the is_* helpers."""
+        predicates = ((KIND_MANIFEST, is_manifest_file),
+                      (KIND_META, is_meta_file),
+                      (KIND_SHARD, is_shard_file))
+        for name in ("manifest", "manifest.json", "20220214T120000Z.manifest",
+                     "bolt", "kv", "sqlite", "meta.00", "20220214T120000Z.meta",
+                     "20240212T140100Z.sqlite.gz", "mydb.autogen.00001.00",
+                     "20220214T120000Z.s1.tar.gz", "000000001.tsm", "x.meta",
+                     "fields.idx", ".manifest", "_00001.wal",
+                     "000000001-000000001.tombstone"):
+            expected = next((kind for kind, pred in predicates if pred(name)), None)
+            self.assertEqual(classify(name), expected, name)
+
+
+class TestDirKeys(unittest.TestCase):
+    """Tests for the per-member directory keys of the archive listing."""
+
+    def test_levels(self):
+        dir_keys = validate_backup._dir_keys
+        self.assertEqual(dir_keys("meta.00"), (None, None))
+        self.assertEqual(dir_keys("root/"), (None, None))
+        self.assertEqual(dir_keys("root/meta.00"), ("root", None))
+        self.assertEqual(dir_keys("root/1234/"), ("root", None))
+        self.assertEqual(dir_keys("root/1234/a.tsm"), ("root", "1234"))
+
+    def test_top_matches_path_parts(self):
+        """Odd names get the top directory of PurePosixPath(name).parts."""
+        dir_keys = validate_backup._dir_keys
+        for name in ("./root/1234/a.tsm", "root//1234/a.tsm", "root/./a.tsm",
+                     "/root/a.tsm", "root/.hidden/a.tsm", "root/1234/a/b"):
+            parts = PurePosixPath(name).parts
+            top = parts[0] if len(parts) > 1 else None
+            self.assertEqual(dir_keys(name)[0], top, name)
+        # A second level is only reported below a literal 'top/' prefix
+        self.assertEqual(dir_keys("root/.hidden/a.tsm"), ("root", ".hidden"))
+        self.assertEqual(dir_keys("./root/1234/a.tsm"), ("root", None))
+
 
 class TestValidateManifest(unittest.TestCase):
     """Tests for the validate_manifest function."""
 
     def test_valid_manifest_with_files(self):
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({"files": ["meta.00", "mydb.autogen.00001.00"]}, f)
-            f.flush()
-            valid, result = validate_manifest(f.name)
-        os.unlink(f.name)
+        valid, result = validate_manifest(io.StringIO(
+            json.dumps({"files": ["meta.00", "mydb.autogen.00001.00"]})))
         self.assertTrue(valid)
         self.assertIn("files", result)
 
     def test_valid_v2_manifest(self):
         """InfluxDB 2.x manifest.json may not have a 'files' key."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump({"version": 1, "buckets": []}, f)
-            f.flush()
-            valid, result = validate_manifest(f.name)
-        os.unlink(f.name)
+        valid, result = validate_manifest(io.StringIO(
+            json.dumps({"version": 1, "buckets": []})))
         self.assertTrue(valid)
 
     def test_invalid_json(self):
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            f.write("not json {{{")
+        valid, result = validate_manifest(io.StringIO("not json {{{"))
+        self.assertFalse(valid)
+        self.assertIn("Invalid JSON", result)
+
+    def test_not_an_object(self):
+        valid, result = validate_manifest(io.BytesIO(b'["meta.00"]'))
+        self.assertFalse(valid)
+        self.assertIn("not a JSON object", result)
+
+    def test_scalar_rejected_before_parsing(self):
+        for data in (b'"meta.00"', b'  42', b'-1', b'true', b'null'):
+            with mock.patch('validate_backup._json_loads') as loads:
+                valid, result = validate_manifest(io.BytesIO(data))
+            loads.assert_not_called()
+            self.assertFalse(valid)
+            self.assertIn("Invalid JSON in manifest: unexpected leading", result)
+
+    def test_utf8_bom(self):
+        valid, result = validate_manifest(io.BytesIO(
+            b'\xef\xbb\xbf{"files": ["meta.00"]}'))
+        self.assertTrue(valid)
+        self.assertEqual(result["files"], ["meta.00"])
+
+    def test_binary_rejected_before_parsing(self):
+        with mock.patch('validate_backup._json_loads') as loads:
+            valid, result = validate_manifest(io.BytesIO(b'\x08\x96\x01' + bytes(4096)))
+        loads.assert_not_called()
+        self.assertFalse(valid)
+        self.assertIn("Invalid JSON", result)
+
+    def test_files_not_a_list(self):
+        valid, result = validate_manifest(io.StringIO('{"files": "meta.00"}'))
+        self.assertFalse(valid)
+        self.assertIn("Invalid manifest structure", result)
+
+    def test_files_entries_not_constrained(self):
+        """Entries of any type are accepted and compared as strings."""
+        valid, result = validate_manifest(io.StringIO('{"files": [1, "meta.00"]}'))
+        self.assertTrue(valid)
+        self.assertEqual(validate_manifest_files_exist(result, {"1"}),
+                         (["meta.00"], 1))
+
+    def test_manifest_path(self):
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json') as f:
+            json.dump({"files": ["meta.00"]}, f)
             f.flush()
             valid, result = validate_manifest(f.name)
-        os.unlink(f.name)
+        self.assertTrue(valid)
+        self.assertEqual(result["files"], ["meta.00"])
+
+    def test_missing_path(self):
+        valid, result = validate_manifest("/nonexistent/manifest.json")
+        self.assertFalse(valid)
+        self.assertIn("Error reading manifest", result)
+
+    def test_cache_invalidated_on_change(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "manifest.json")
+            with open(path, 'w') as f:
+                json.dump({"files": ["meta.00"]}, f)
+            first = validate_manifest(path)
+            self.assertIs(validate_manifest(path)[1], first[1])
+            with open(path, 'w') as f:
+                f.write("not json {{{")
+            valid, result = validate_manifest(path)
         self.assertFalse(valid)
         self.assertIn("Invalid JSON", result)
 
+    def test_read_errors_not_cached(self):
+        """A transient read failure is retried on the next call."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "manifest.json")
+            with open(path, 'w') as f:
+                json.dump({"files": ["meta.00"]}, f)
+            real_open = open
+
+            def flaky_open(file, *args, **kwargs):
+                if file == os.path.realpath(path):
+                    raise OSError(5, "Input/output error")
+                return real_open(file, *args, **kwargs)
+
+            validate_backup._validate_manifest_cached.cache_clear()
+            with mock.patch('builtins.open', flaky_open):
+                valid, result = validate_manifest(path)
+            self.assertFalse(valid)
+            self.assertIn("Input/output error", result)
+            valid, result = validate_manifest(path)
+        self.assertTrue(valid)
+        self.assertEqual(result["files"], ["meta.00"])
+
+    def test_stdlib_json_fallback(self):
+        """Without orjson, manifests are parsed by json.loads, which is
+        handed the same raw str or bytes as orjson."""
+        cases = ((io.StringIO('{"files": ["meta.00"]}'), True),
+                 (io.BytesIO(b'\xef\xbb\xbf{"files": ["meta.00"]}'), True),
+                 (io.StringIO('{"files": ['), False),
+                 (io.BytesIO(b'{"files": ['), False))
+        with mock.patch('validate_backup._json_loads', json.loads):
+            for stream, expected in cases:
+                with self.subTest(data=stream.getvalue()):
+                    valid, result = validate_manifest(stream)
+                    self.assertEqual(valid, expected)
+                    if valid:
+                        self.assertEqual(result["files"], ["meta.00"])
+                    else:
+                        self.assertIn("Invalid JSON", result)
+
+    def test_stdlib_json_fallback_undecodable(self):
+        """Non-UTF-8 and too deeply nested manifests are invalid, not fatal."""
+        with tempfile.TemporaryDirectory() as tmpdir, \
+                mock.patch('validate_backup._json_loads', json.loads):
+            for data in (b'{"files": ["caf\xe9"]}', b'[' * 100000):
+                path = os.path.join(tmpdir, "manifest.json")
+                with open(path, 'wb') as f:
+                    f.write(data)
+                valid, result = validate_manifest(path)
+                self.assertFalse(valid)
+                self.assertIn("Invalid JSON", result)
+                valid, result = validate_manifest(io.BytesIO(data))
+                self.assertFalse(valid)
+                self.assertIn("Invalid JSON", result)
+
 
 class TestValidateManifestFilesExist(unittest.TestCase):
     """Tests for the validate_manifest_files_exist function."""
@@ -163,6 +357,77 @@ class TestValidateManifestFilesExist(unittest.TestCase):
         self.assertEqual(missing, [])
         self.assertEqual(found, 1)
 
+    def test_dict_entries_empty_file_name(self):
+        """An empty 'fileName' falls back to 'filename'."""
+        manifest = {"files": [
+            {"fileName": "meta.00"},
+            {"fileName": "", "filename": "mydb.autogen.00001.00"},
+        ]}
+        missing, found = validate_manifest_files_exist(manifest, {"meta.00"})
+        self.assertEqual(missing, ["mydb.autogen.00001.00"])
+        self.assertEqual(found, 1)
+
+    def test_mixed_entries(self):
+        manifest = {"files": [{"fileName": "meta.00"}, "mydb.autogen.00001.00"]}
+        existing = {"meta.00", "mydb.autogen.00001.00"}
+        missing, found = validate_manifest_files_exist(manifest, existing)
+        self.assertEqual(missing, [])
+        self.assertEqual(found, 2)
+
+    def test_mixed_entries_string_first(self):
+        manifest = {"files": ["meta.00", {"fileName": "mydb.autogen.00001.00"}]}
+        existing = {"meta.00", "mydb.autogen.00001.00"}
+        missing, found = validate_manifest_files_exist(manifest, existing)
+        self.assertEqual(missing, [])
+        self.assertEqual(found, 2)
+
+    def test_non_string_file_names(self):
+        """Numeric names are compared (and reported) as strings."""
+        manifest = {"files": [{"fileName": 12345}, {"fileName": "meta.00"}]}
+        missing, found = validate_manifest_files_exist(manifest, {"meta.00"})
+        self.assertEqual(missing, ["12345"])
+        self.assertEqual(found, 1)
+        manifest = {"files": ["meta.00", 12345, 1.5]}
+        missing, found = validate_manifest_files_exist(manifest, {"12345"})
+        self.assertEqual(missing, ["1.5", "meta.00"])
+        self.assertEqual(found, 1)
+
+    def test_non_string_and_dotted_names(self):
+        """Numbers mixed with './' names do not reach _canonical_name."""
+        for files, expected in ((["./", 1], []),
+                                ([1, "./"], []),
+                                (["./bolt", 1, "./1/a.tsm"], ["1/a.tsm", "bolt"])):
+            self.assertEqual(validate_manifest_files_exist({"files": files}, {"1"}),
+                             (expected, 1))
+
+    def test_duplicate_entries_counted_once(self):
+        manifest = {"files": ["meta.00", "meta.00", "b", "a", "b"]}
+        missing, found = validate_manifest_files_exist(manifest, {"meta.00"})
+        self.assertEqual(missing, ["a", "b"])
+        self.assertEqual(found, 1)
+
+    def test_existing_as_list(self):
+        manifest = {"files": ["meta.00", "mydb.autogen.00001.00"]}
+        missing, found = validate_manifest_files_exist(manifest, ["meta.00"])
+        self.assertEqual(missing, ["mydb.autogen.00001.00"])
+        self.assertEqual(found, 1)
+
+    def test_dot_slash_entries(self):
+        """Entries are compared as canonical relative paths."""
+        manifest = {"files": ["./meta.00", "././1234/000000001.tsm"]}
+        existing = {"meta.00", "1234/000000001.tsm"}
+        missing, found = validate_manifest_files_exist(manifest, existing)
+        self.assertEqual(missing, [])
+        self.assertEqual(found, 2)
+
+    def test_many_missing(self):
+        """Large manifests report every missing entry, sorted."""
+        names = [f"1234/{i:09d}.tsm" for i in range(5000, 0, -1)]
+        existing = set(names[::2])
+        missing, found = validate_manifest_files_exist({"files": names}, existing)
+        self.assertEqual(missing, sorted(names[1::2]))
+        self.assertEqual(found, 2500)
+
     def test_no_files_key(self):
         """A manifest without 'files' produces no missing/found."""
         manifest = {"version": 1}
@@ -170,72 +435,206 @@ class TestValidateManifestFilesExist(unittest.TestCase):
         self.assertEqual(missing, [])
         self.assertEqual(found, 0)
 
+    def test_slim_manifest_cross_refs_the_same(self):
+        """The names-only manifest kept by archive checks agrees with the
+        full one, including duplicates and the 'filename' fallback."""
+        manifest = {"kvStore": {"fileName": "bolt"}, "files": [
+            {"fileName": "1/a.tsm", "size": 1},
+            {"fileName": "", "filename": "1/b.tsm"},
+            {"fileName": "1/a.tsm", "size": 1},
+            {"size": 0},
+            {"fileName": None, "filename": "9999/c.tsm"},
+        ]}
+        slim = validate_backup._slim_manifest(manifest)
+        self.assertEqual(slim, {"files": ["1/a.tsm", "1/b.tsm", "1/a.tsm", None,
+                                          "9999/c.tsm"]})
+        for existing in ({"1/a.tsm"}, {"1/a.tsm", "1/b.tsm"},
+                         {"1/a.tsm", "1/b.tsm", "9999/c.tsm"}):
+            self.assertEqual(validate_manifest_files_exist(slim, existing),
+                             validate_manifest_files_exist(manifest, existing))
+        manifest = {"files": [
+            {"fileName": "1/a.tsm"},
+            {"fileName": None, "filename": "9999/missing.tsm"},
+        ]}
+        slim = validate_backup._slim_manifest(manifest)
+        self.assertEqual(validate_manifest_files_exist(manifest, {"1/a.tsm"}),
+                         (["9999/missing.tsm"], 1))
+        self.assertEqual(validate_manifest_files_exist(slim, {"1/a.tsm"}),
+                         (["9999/missing.tsm"], 1))
+        self.assertEqual(validate_backup._slim_manifest({"version": 1}), {})
+
 
 # ---- Directory-based backup tests ----------------------------------------
 
+def _write_file(path, data=b''):
+    """Create *path* containing *data* with a single write call."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
 class TestValidateBackupDirectoryV1(unittest.TestCase):
     """Tests for validate_backup_directory -- InfluxDB 1.x backups."""
 
-    def _make_legacy_backup(self, tmpdir):
-        with open(os.path.join(tmpdir, "meta.00"), 'wb') as f:
-            f.write(b'\x00' * 64)
-        with open(os.path.join(tmpdir, "mydb.autogen.00001.00"), 'wb') as f:
-            f.write(b'\x00' * 128)
-
-    def _make_portable_backup(self, tmpdir):
+    @classmethod
+    def setUpClass(cls):
+        # The valid backups are only read, so build them once for the class
+        cls._fixtures = tempfile.TemporaryDirectory()
+        cls.legacy_dir = os.path.join(cls._fixtures.name, "legacy")
+        cls.portable_dir = os.path.join(cls._fixtures.name, "portable")
+        os.mkdir(cls.legacy_dir)
+        os.mkdir(cls.portable_dir)
+        cls._make_legacy_backup(cls.legacy_dir)
+        cls._make_portable_backup(cls.portable_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._fixtures.cleanup()
+
+    @staticmethod
+    def _make_legacy_backup(tmpdir):
+        _write_file(os.path.join(tmpdir, "meta.00"), _ZEROS[:64])
+        _write_file(os.path.join(tmpdir, "mydb.autogen.00001.00"), _ZEROS[:128])
+
+    @staticmethod
+    def _make_portable_backup(tmpdir):
         ts = "20220214T120000Z"
         manifest = {"files": [f"{ts}.meta", f"{ts}.s1.tar.gz"]}
-        with open(os.path.join(tmpdir, f"{ts}.manifest"), 'w') as f:
-            json.dump(manifest, f)
-        with open(os.path.join(tmpdir, f"{ts}.meta"), 'wb') as f:
-            f.write(b'\x00' * 64)
-        with open(os.path.join(tmpdir, f"{ts}.s1.tar.gz"), 'wb') as f:
-            f.write(b'\x00' * 128)
+        _write_file(os.path.join(tmpdir, f"{ts}.manifest"), json.dumps(manifest).encode())
+        _write_file(os.path.join(tmpdir, f"{ts}.meta"), _ZEROS[:64])
+        _write_file(os.path.join(tmpdir, f"{ts}.s1.tar.gz"), _ZEROS[:128])
 
     def test_valid_legacy_backup(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            self._make_legacy_backup(tmpdir)
-            self.assertTrue(validate_backup_directory(tmpdir))
+        self.assertTrue(validate_backup_directory(self.legacy_dir))
 
     def test_valid_portable_backup(self):
+        self.assertTrue(validate_backup_directory(self.portable_dir))
+
+    def test_missing_or_non_directory_path_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            self._make_portable_backup(tmpdir)
-            self.assertTrue(validate_backup_directory(tmpdir))
+            path = os.path.join(tmpdir, "meta.00")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_directory(path))
+                _write_file(path, _ZEROS[:64])
+                self.assertFalse(validate_backup_directory(path))
+        self.assertIn("does not exist", out.getvalue())
+        self.assertIn("not a directory", out.getvalue())
 
     def test_missing_meta_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "mydb.autogen.00001.00"), 'wb') as f:
-                f.write(b'\x00' * 128)
+            _write_file(os.path.join(tmpdir, "mydb.autogen.00001.00"), _ZEROS[:128])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_empty_meta_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "meta.00"), 'wb') as f:
-                pass  # empty
-            with open(os.path.join(tmpdir, "mydb.autogen.00001.00"), 'wb') as f:
-                f.write(b'\x00' * 128)
+            _write_file(os.path.join(tmpdir, "meta.00"))  # empty
+            _write_file(os.path.join(tmpdir, "mydb.autogen.00001.00"), _ZEROS[:128])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_no_data_files_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "meta.00"), 'wb') as f:
-                f.write(b'\x00' * 64)
+            _write_file(os.path.join(tmpdir, "meta.00"), _ZEROS[:64])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_manifest_missing_file_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             ts = "20220214T120000Z"
             manifest = {"files": [f"{ts}.meta", f"{ts}.s1.tar.gz"]}
-            with open(os.path.join(tmpdir, f"{ts}.manifest"), 'w') as f:
-                json.dump(manifest, f)
-            with open(os.path.join(tmpdir, f"{ts}.meta"), 'wb') as f:
-                f.write(b'\x00' * 64)
+            _write_file(os.path.join(tmpdir, f"{ts}.manifest"), json.dumps(manifest).encode())
+            _write_file(os.path.join(tmpdir, f"{ts}.meta"), _ZEROS[:64])
             # Add an unrelated data file so validation reaches the manifest
             # cross-referencing step (which should catch the missing shard).
-            with open(os.path.join(tmpdir, "other.autogen.00001.00"), 'wb') as f:
-                f.write(b'\x00' * 64)
+            _write_file(os.path.join(tmpdir, "other.autogen.00001.00"), _ZEROS[:64])
             self.assertFalse(validate_backup_directory(tmpdir))
 
+    def test_missing_listing_is_capped(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            names = [f"mydb.autogen.{i:05d}.00" for i in range(1, 61)]
+            manifest = {"files": ["meta.00", *names]}
+            _write_file(os.path.join(tmpdir, "manifest"), json.dumps(manifest).encode())
+            _write_file(os.path.join(tmpdir, "meta.00"), _ZEROS[:64])
+            _write_file(os.path.join(tmpdir, names[0]), _ZEROS[:64])
+            out = io.StringIO()
+            with mock.patch.object(validate_backup, "MAX_LISTED_MISSING", 5), \
+                    contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_directory(tmpdir))
+        text = out.getvalue()
+        self.assertIn("59 file(s) listed in manifest are missing", text)
+        self.assertIn(f"    - {names[5]}\n", text)
+        self.assertNotIn(names[6], text)
+        self.assertIn("... and 54 more", text)
+
+    def test_legacy_walk_skips_relative_paths(self):
+        """Without a manifest file list no relative paths are built."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._make_legacy_backup(tmpdir)
+            os.mkdir(os.path.join(tmpdir, "mydb"))
+            _write_file(os.path.join(tmpdir, "mydb", "mydb.autogen.00002.00"), _ZEROS[:128])
+            with mock.patch('validate_backup._scan_subdir',
+                            wraps=validate_backup._scan_subdir) as scan:
+                self.assertTrue(validate_backup_directory(tmpdir))
+        self.assertEqual(scan.call_count, 1)
+        self.assertFalse(scan.call_args.args[3])
+
+    def test_empty_shard_files_reported(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._make_legacy_backup(tmpdir)
+            _write_file(os.path.join(tmpdir, "mydb.autogen.00002.00"))  # empty
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_directory(tmpdir))
+        self.assertIn("Shard backup files found: 2", out.getvalue())
+        self.assertIn("1 empty shard file(s)", out.getvalue())
+
+    def test_unreadable_subdirectory_fails(self):
+        """A directory that cannot be listed fails validation cleanly."""
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write_file(os.path.join(tmpdir, "meta.00"), _ZEROS[:64])
+            os.makedirs(os.path.join(tmpdir, "mydb", "locked"))
+            for quick in (False, True):
+                out = io.StringIO()
+                with mock.patch('validate_backup.os.scandir', scandir), \
+                        contextlib.redirect_stdout(out):
+                    self.assertFalse(validate_backup_directory(tmpdir, quick=quick))
+                self.assertIn("Cannot read backup directory", out.getvalue())
+                self.assertIn("locked", out.getvalue())
+            # The backup root itself
+            self._make_legacy_backup(tmpdir)
+            out = io.StringIO()
+            with mock.patch('validate_backup.os.scandir',
+                            side_effect=PermissionError(13, "Permission denied")), \
+                    contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_directory(tmpdir))
+            self.assertIn("Cannot read backup directory", out.getvalue())
+
+    def test_quick_valid_legacy_backup(self):
+        self.assertTrue(validate_backup_directory(self.legacy_dir, quick=True))
+
+    def test_quick_no_data_files_fails(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _write_file(os.path.join(tmpdir, "meta.00"), _ZEROS[:64])
+            os.mkdir(os.path.join(tmpdir, "1234"))
+            self.assertFalse(validate_backup_directory(tmpdir, quick=True))
+
+    def test_quick_still_cross_references_manifest(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ts = "20220214T120000Z"
+            manifest = {"files": [f"{ts}.meta", f"{ts}.s1.tar.gz"]}
+            _write_file(os.path.join(tmpdir, f"{ts}.manifest"), json.dumps(manifest).encode())
+            _write_file(os.path.join(tmpdir, f"{ts}.meta"), _ZEROS[:64])
+            _write_file(os.path.join(tmpdir, "other.autogen.00001.00"), _ZEROS[:64])
+            self.assertFalse(validate_backup_directory(tmpdir, quick=True))
+
     def test_nonexistent_dir_fails(self):
         self.assertFalse(validate_backup_directory("/nonexistent/path"))
 
@@ -256,75 +655,87 @@ class TestValidateBackupDirectoryV2(unittest.TestCase):
             {"fileName": "bolt"},
             {"fileName": "1234/000000001.tsm"},
         ]}
-        with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-            json.dump(manifest, f)
-        with open(os.path.join(tmpdir, "bolt"), 'wb') as f:
-            f.write(b'\x00' * 256)
+        _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps(manifest).encode())
+        _write_file(os.path.join(tmpdir, "bolt"), _ZEROS[:256])
         shard_dir = os.path.join(tmpdir, "1234")
         os.makedirs(shard_dir)
-        with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-            f.write(b'\x00' * 512)
+        _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
 
     def test_valid_v2_backup(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             self._make_v2_backup(tmpdir)
             self.assertTrue(validate_backup_directory(tmpdir))
 
+    def test_numeric_file_name_reported_missing(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._make_v2_backup(tmpdir)
+            manifest = {"files": [{"fileName": "bolt"}, {"fileName": 12345}]}
+            _write_file(os.path.join(tmpdir, "manifest.json"),
+                        json.dumps(manifest).encode())
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_directory(tmpdir))
+        self.assertIn("    - 12345\n", out.getvalue())
+
+    def test_symlinked_shard_dir(self):
+        """A top-level shard directory may be a symlink to the real one."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            backup = os.path.join(tmpdir, "backup")
+            real = os.path.join(tmpdir, "real")
+            os.mkdir(backup)
+            os.mkdir(real)
+            self._make_v2_backup(real)
+            for name in ("manifest.json", "bolt"):
+                os.rename(os.path.join(real, name), os.path.join(backup, name))
+            os.symlink(os.path.join(real, "1234"), os.path.join(backup, "1234"))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_directory(backup))
+                self.assertTrue(validate_backup_directory(backup, quick=True))
+        self.assertIn("1234: 1 files", out.getvalue())
+
     def test_v2_missing_bolt_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-                json.dump({"version": 2}, f)
+            _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps({"version": 2}).encode())
             shard_dir = os.path.join(tmpdir, "1234")
             os.makedirs(shard_dir)
-            with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-                f.write(b'\x00' * 512)
+            _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_v2_empty_bolt_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-                json.dump({"version": 2}, f)
-            with open(os.path.join(tmpdir, "bolt"), 'wb') as f:
-                pass  # empty
+            _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps({"version": 2}).encode())
+            _write_file(os.path.join(tmpdir, "bolt"))  # empty
             shard_dir = os.path.join(tmpdir, "1234")
             os.makedirs(shard_dir)
-            with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-                f.write(b'\x00' * 512)
+            _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_v2_no_shard_data_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-                json.dump({"version": 2}, f)
-            with open(os.path.join(tmpdir, "bolt"), 'wb') as f:
-                f.write(b'\x00' * 256)
+            _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps({"version": 2}).encode())
+            _write_file(os.path.join(tmpdir, "bolt"), _ZEROS[:256])
             self.assertFalse(validate_backup_directory(tmpdir))
 
     def test_v2_kv_instead_of_bolt(self):
         """Some InfluxDB 2.x versions use 'kv' instead of 'bolt'."""
         with tempfile.TemporaryDirectory() as tmpdir:
-            with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-                json.dump({"version": 2}, f)
-            with open(os.path.join(tmpdir, "kv"), 'wb') as f:
-                f.write(b'\x00' * 256)
+            _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps({"version": 2}).encode())
+            _write_file(os.path.join(tmpdir, "kv"), _ZEROS[:256])
             shard_dir = os.path.join(tmpdir, "1234")
             os.makedirs(shard_dir)
-            with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-                f.write(b'\x00' * 512)
+            _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
             self.assertTrue(validate_backup_directory(tmpdir))
 
     def test_v2_timestamped_bolt(self):
         """InfluxDB 2.x may produce timestamped bolt files."""
         with tempfile.TemporaryDirectory() as tmpdir:
             ts = "20240212T140100Z"
-            with open(os.path.join(tmpdir, f"{ts}.manifest"), 'w') as f:
-                json.dump({"version": 2}, f)
-            with open(os.path.join(tmpdir, f"{ts}.bolt"), 'wb') as f:
-                f.write(b'\x00' * 256)
+            _write_file(os.path.join(tmpdir, f"{ts}.manifest"), json.dumps({"version": 2}).encode())
+            _write_file(os.path.join(tmpdir, f"{ts}.bolt"), _ZEROS[:256])
             shard_dir = os.path.join(tmpdir, "1234")
             os.makedirs(shard_dir)
-            with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-                f.write(b'\x00' * 512)
+            _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
             self.assertTrue(validate_backup_directory(tmpdir))
 
     def test_v2_manifest_cross_ref(self):
@@ -334,16 +745,44 @@ class TestValidateBackupDirectoryV2(unittest.TestCase):
                 {"fileName": "bolt"},
                 {"fileName": "9999/missing.tsm"},
             ]}
-            with open(os.path.join(tmpdir, "manifest.json"), 'w') as f:
-                json.dump(manifest, f)
-            with open(os.path.join(tmpdir, "bolt"), 'wb') as f:
-                f.write(b'\x00' * 256)
+            _write_file(os.path.join(tmpdir, "manifest.json"), json.dumps(manifest).encode())
+            _write_file(os.path.join(tmpdir, "bolt"), _ZEROS[:256])
             shard_dir = os.path.join(tmpdir, "1234")
             os.makedirs(shard_dir)
-            with open(os.path.join(shard_dir, "000000001.tsm"), 'wb') as f:
-                f.write(b'\x00' * 512)
+            _write_file(os.path.join(shard_dir, "000000001.tsm"), _ZEROS[:512])
             self.assertFalse(validate_backup_directory(tmpdir))
 
+    def test_v2_shard_dir_summary(self):
+        """Files, bytes and empty files are summarized per directory."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._make_v2_backup(tmpdir)
+            os.makedirs(os.path.join(tmpdir, "1234", "index"))
+            _write_file(os.path.join(tmpdir, "1234", "index", "L0-00000001.tsi"),
+                        _ZEROS[:1024])
+            _write_file(os.path.join(tmpdir, "1234", "000000002.tsm"))  # empty
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_directory(tmpdir))
+        self.assertIn("1234: 1 empty data file(s)", out.getvalue())
+        self.assertIn("1234: 3 files", out.getvalue())
+        self.assertIn("Total data files: 3", out.getvalue())
+
+    def test_v2_parallel_walk_matches_serial(self):
+        """Walking shard dirs in threads reports the same summary."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._make_v2_backup(tmpdir)
+            for shard in ("2345", "3456", "4567"):
+                os.makedirs(os.path.join(tmpdir, shard))
+                _write_file(os.path.join(tmpdir, shard, "000000001.tsm"), _ZEROS[:512])
+            outputs = []
+            for workers in (1, 4):
+                out = io.StringIO()
+                with contextlib.redirect_stdout(out):
+                    self.assertTrue(validate_backup_directory(tmpdir, workers=workers))
+                outputs.append(out.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("Total data files: 4", outputs[0])
+
     def test_v2_compressed_backup_layout(self):
         """Backup with gzip-compressed metadata and numbered shard archives."""
         ts = "20260212T025958Z"
@@ -353,14 +792,10 @@ class TestValidateBackupDirectoryV2(unittest.TestCase):
                 {"fileName": f"{ts}.sqlite.gz"},
                 {"fileName": f"{ts}.1.tar.gz"},
             ]}
-            with open(os.path.join(tmpdir, f"{ts}.manifest"), 'w') as f:
-                json.dump(manifest, f)
-            with open(os.path.join(tmpdir, f"{ts}.bolt.gz"), 'wb') as f:
-                f.write(b'\x00' * 256)
-            with open(os.path.join(tmpdir, f"{ts}.sqlite.gz"), 'wb') as f:
-                f.write(b'\x00' * 256)
-            with open(os.path.join(tmpdir, f"{ts}.1.tar.gz"), 'wb') as f:
-                f.write(b'\x00' * 128)
+            _write_file(os.path.join(tmpdir, f"{ts}.manifest"), json.dumps(manifest).encode())
+            _write_file(os.path.join(tmpdir, f"{ts}.bolt.gz"), _ZEROS[:256])
+            _write_file(os.path.join(tmpdir, f"{ts}.sqlite.gz"), _ZEROS[:256])
+            _write_file(os.path.join(tmpdir, f"{ts}.1.tar.gz"), _ZEROS[:128])
             self.assertTrue(validate_backup_directory(tmpdir))
 
 
@@ -376,29 +811,40 @@ class TestValidateBackupArchive(unittest.TestCase):
         member is prefixed with ``root_dir/`` to simulate ``tar -czf``
         wrapping a directory.
         """
-        mode = 'w:gz' if compress else 'w'
         suffix = '.tar.gz' if compress else '.tar'
         archive_path = os.path.join(tmpdir, f"backup{suffix}")
-        with tarfile.open(archive_path, mode) as tar:
+        # Tests only check framing, so use the cheapest gzip level
+        kwargs = {'mode': 'w:gz', 'compresslevel': 1} if compress else {'mode': 'w'}
+        with tarfile.open(archive_path, **kwargs) as tar:
             if root_dir:
                 d = tarfile.TarInfo(name=root_dir)
                 d.type = tarfile.DIRTYPE
                 tar.addfile(d)
             for name, content in files.items():
-                data = content if isinstance(content, bytes) else content.encode()
+                data = content.encode() if isinstance(content, str) else content
                 full_name = f"{root_dir}/{name}" if root_dir else name
                 info = tarfile.TarInfo(name=full_name)
                 info.size = len(data)
                 tar.addfile(info, io.BytesIO(data))
         return archive_path
 
+    def test_missing_or_non_file_path_fails(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_archive(
+                    os.path.join(tmpdir, "backup.tar")))
+                self.assertFalse(validate_backup_archive(tmpdir))
+        self.assertIn("does not exist", out.getvalue())
+        self.assertIn("not a file", out.getvalue())
+
     # -- InfluxDB 1.x archives --
 
     def test_valid_legacy_archive(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
-                "meta.00": b'\x00' * 64,
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
             })
             self.assertTrue(validate_backup_archive(archive))
 
@@ -408,23 +854,139 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 f"{ts}.manifest": manifest,
-                f"{ts}.meta": b'\x00' * 64,
-                f"{ts}.s1.tar.gz": b'\x00' * 128,
+                f"{ts}.meta": _ZEROS[:64],
+                f"{ts}.s1.tar.gz": _ZEROS[:128],
             })
             self.assertTrue(validate_backup_archive(archive))
 
     def test_valid_compressed_archive(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
-                "meta.00": b'\x00' * 64,
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
             }, compress=True)
             self.assertTrue(validate_backup_archive(archive))
 
+    def test_external_gunzip(self):
+        """Large .tar.gz archives are piped through an external gunzip."""
+        manifest = json.dumps({"version": 2, "files": [
+            {"fileName": "bolt"},
+            {"fileName": "1234/000000001.tsm"},
+        ]})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "manifest.json": manifest,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
+            }, compress=True, root_dir="influxdb_backup_20240101_120000")
+            with mock.patch('validate_backup.EXTERNAL_GUNZIP', ('gzip', '-dc')), \
+                    mock.patch('validate_backup.EXTERNAL_GUNZIP_MIN_SIZE', 0):
+                self.assertTrue(validate_backup_archive(archive))
+
+    def test_accelerated_gunzip(self):
+        """gzip archives are read through python-isal when installed."""
+        manifest = json.dumps({"version": 2})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "manifest.json": manifest,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
+            }, compress=True)
+            fake_igzip = mock.Mock(IGzipFile=mock.Mock(wraps=gzip.GzipFile))
+            with mock.patch('validate_backup.igzip', fake_igzip):
+                self.assertTrue(validate_backup_archive(archive))
+        fake_igzip.IGzipFile.assert_called_once_with(archive, 'rb')
+
+    def test_zstd_archive_without_zstandard_fails(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = os.path.join(tmpdir, "backup.tar.zst")
+            _write_file(archive, b'\x28\xb5\x2f\xfd' + _ZEROS[:508])
+            out = io.StringIO()
+            with mock.patch('validate_backup.zstandard', None), \
+                    contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_archive(archive))
+        self.assertIn("zstandard", out.getvalue())
+
+    def test_valid_bz2_archive(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
+            })
+            bz2_path = archive + ".bz2"
+            with open(archive, 'rb') as src, open(bz2_path, 'wb') as dst:
+                dst.write(bz2.compress(src.read()))
+            self.assertTrue(validate_backup_archive(bz2_path))
+
+    def test_main_detects_archive_by_signature(self):
+        """Archives with other suffixes are recognized by their contents."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
+            })
+            tbz2_path = os.path.join(tmpdir, "backup.tbz2")
+            with open(archive, 'rb') as src, open(tbz2_path, 'wb') as dst:
+                dst.write(bz2.compress(src.read()))
+            notes = os.path.join(tmpdir, "notes.txt")
+            _write_file(notes, b"not an archive")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                for path, status in ((tbz2_path, 0), (notes, 1)):
+                    with mock.patch('sys.argv', ['validate_backup.py', path]), \
+                            self.assertRaises(SystemExit) as cm:
+                        validate_backup.main()
+                    self.assertEqual(cm.exception.code, status, path)
+        self.assertIn("Unknown file type", out.getvalue())
+
+    def test_stream_does_not_retain_members(self):
+        """Parsed headers are dropped as the archive streams past."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "meta.00": _ZEROS[:64],
+                **{f"mydb.autogen.{i:05d}.00": _ZEROS[:16] for i in range(1, 20)},
+            }, compress=True)
+            retained = []
+            real_next = tarfile.TarFile.next
+
+            def next_member(tar):
+                retained.append(len(tar.members))
+                return real_next(tar)
+
+            with mock.patch.object(tarfile.TarFile, 'next', next_member):
+                self.assertTrue(validate_backup_archive(archive))
+        self.assertGreater(len(retained), 20)
+        self.assertLessEqual(max(retained), 1)
+
+    def test_valid_xz_archive(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
+            })
+            xz_path = archive + ".xz"
+            with open(archive, 'rb') as src, open(xz_path, 'wb') as dst:
+                dst.write(lzma.compress(src.read()))
+            self.assertTrue(validate_backup_archive(xz_path))
+
+    def test_truncated_compressed_archive_fails(self):
+        """A cut-off compressed stream is reported as a tar read error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "meta.00": _ZEROS[:64],
+                "mydb.autogen.00001.00": os.urandom(64 * 1024),
+            }, compress=True)
+            os.truncate(archive, os.path.getsize(archive) // 2)
+            out = io.StringIO()
+            with mock.patch('validate_backup.igzip', None), \
+                    contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_archive(archive))
+        self.assertIn("Error reading tar archive", out.getvalue())
+
     def test_missing_meta_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                "mydb.autogen.00001.00": _ZEROS[:128],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -432,14 +994,14 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "meta.00": b'',
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                "mydb.autogen.00001.00": _ZEROS[:128],
             })
             self.assertFalse(validate_backup_archive(archive))
 
     def test_no_data_files_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
-                "meta.00": b'\x00' * 64,
+                "meta.00": _ZEROS[:64],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -449,17 +1011,31 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 f"{ts}.manifest": manifest,
-                f"{ts}.meta": b'\x00' * 64,
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                f"{ts}.meta": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
             })
             self.assertFalse(validate_backup_archive(archive))
 
+    def test_manifest_after_data_compressed(self):
+        """The manifest is read in the same pass even when it comes last."""
+        manifest = json.dumps({"version": 2, "files": [
+            {"fileName": "bolt"},
+            {"fileName": "9999/missing.tsm"},
+        ]})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
+                "manifest.json": manifest,
+            }, compress=True)
+            self.assertFalse(validate_backup_archive(archive))
+
     def test_invalid_manifest_json_fails(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "20220214T120000Z.manifest": "not json {{{",
-                "20220214T120000Z.meta": b'\x00' * 64,
-                "mydb.autogen.00001.00": b'\x00' * 128,
+                "20220214T120000Z.meta": _ZEROS[:64],
+                "mydb.autogen.00001.00": _ZEROS[:128],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -484,8 +1060,8 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             })
             self.assertTrue(validate_backup_archive(archive))
 
@@ -502,17 +1078,51 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             }, compress=True, root_dir="influxdb_backup_20240101_120000")
             self.assertTrue(validate_backup_archive(archive))
 
+    def test_v2_dot_slash_members(self):
+        """Archives made with ``tar -C dir .`` prefix members with './'."""
+        manifest = json.dumps({"version": 2, "files": [
+            {"fileName": "bolt"},
+            {"fileName": "1234/000000001.tsm"},
+        ]})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "./manifest.json": manifest,
+                "./bolt": _ZEROS[:256],
+                "./1234/000000001.tsm": _ZEROS[:512],
+            })
+            self.assertTrue(validate_backup_archive(archive))
+
+    def test_v2_directory_file_counts(self):
+        """Files are counted per top-level directory below the root."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "manifest.json": json.dumps({"version": 2}),
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
+                "1234/index/L0-00000001.tsi": _ZEROS[:64],
+                "5678/000000001.tsm": _ZEROS[:512],
+                "_series/00/0000": _ZEROS[:64],
+                "5678/000000002.tsm": b'',
+            }, root_dir="influxdb_backup_20240101_120000")
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_archive(archive))
+        self.assertIn("- 1234: 2 files", out.getvalue())
+        self.assertIn("1 empty data file(s) in archive", out.getvalue())
+        self.assertIn("- 5678: 2 files", out.getvalue())
+        self.assertNotIn("- _series", out.getvalue())
+
     def test_v2_missing_bolt_fails(self):
         manifest = json.dumps({"version": 2})
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "1234/000000001.tsm": _ZEROS[:512],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -522,16 +1132,33 @@ class TestValidateBackupArchive(unittest.TestCase):
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
                 "bolt": b'',
-                "1234/000000001.tsm": b'\x00' * 512,
+                "1234/000000001.tsm": _ZEROS[:512],
             })
             self.assertFalse(validate_backup_archive(archive))
 
+    def test_v2_empty_bolt_stops_scan(self):
+        """An empty bolt fails before the rest of the archive is read."""
+        manifest = json.dumps({"version": 2})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "manifest.json": manifest,
+                "bolt": b'',
+                "1234/000000001.tsm": _ZEROS[:8192],
+            })
+            # Cut the archive off in the middle of the shard data
+            os.truncate(archive, 4096)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertFalse(validate_backup_archive(archive))
+        self.assertIn("Metadata file is empty: bolt", out.getvalue())
+        self.assertNotIn("Error reading tar archive", out.getvalue())
+
     def test_v2_no_data_fails(self):
         manifest = json.dumps({"version": 2})
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
+                "bolt": _ZEROS[:256],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -544,8 +1171,8 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             })
             self.assertFalse(validate_backup_archive(archive))
 
@@ -555,7 +1182,7 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "1234/000000001.tsm": _ZEROS[:512],
             }, root_dir="influxdb_backup_20240101_120000")
             self.assertFalse(validate_backup_archive(archive))
 
@@ -582,8 +1209,8 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             }, compress=True, root_dir="influxdb_backup_20240101_120000")
             self.assertTrue(validate_backup_archive(archive))
 
@@ -594,11 +1221,30 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 "manifest.json": manifest,
-                "bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                "bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             }, root_dir="my_custom_backup_name")
             # Should still pass validation (data is valid) but warn
-            self.assertTrue(validate_backup_archive(archive))
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_archive(archive))
+        self.assertIn("No influxdb_backup_* directory found", out.getvalue())
+
+    def test_v2_nested_backup_dir_found(self):
+        """The backup dir may sit below the archive root, without its own
+        directory entry, as long as find -type d would match it."""
+        manifest = json.dumps({"version": 2})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = self._create_tar(tmpdir, {
+                "backups/influxdb_backup_20240101_120000/manifest.json": manifest,
+                "backups/influxdb_backup_20240101_120000/bolt": _ZEROS[:256],
+                "backups/influxdb_backup_20240101_120000/1234/000000001.tsm": _ZEROS[:512],
+                "backups/influxdb_backup_notes.txt": "not a directory",
+            })
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertTrue(validate_backup_archive(archive))
+        self.assertIn("matches expected influxdb_backup_* pattern", out.getvalue())
 
     def test_v2_timestamped_bolt_archive(self):
         """Archive with timestamped .bolt metadata file should be valid."""
@@ -607,8 +1253,8 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 f"{ts}.manifest": manifest,
-                f"{ts}.bolt": b'\x00' * 256,
-                "1234/000000001.tsm": b'\x00' * 512,
+                f"{ts}.bolt": _ZEROS[:256],
+                "1234/000000001.tsm": _ZEROS[:512],
             }, compress=True, root_dir="influxdb_backup_20240101_120000")
             self.assertTrue(validate_backup_archive(archive))
 
@@ -623,9 +1269,9 @@ class TestValidateBackupArchive(unittest.TestCase):
         with tempfile.TemporaryDirectory() as tmpdir:
             archive = self._create_tar(tmpdir, {
                 f"{ts}.manifest": manifest,
-                f"{ts}.bolt.gz": b'\x00' * 256,
-                f"{ts}.sqlite.gz": b'\x00' * 256,
-                f"{ts}.1.tar.gz": b'\x00' * 128,
+                f"{ts}.bolt.gz": _ZEROS[:256],
+                f"{ts}.sqlite.gz": _ZEROS[:256],
+                f"{ts}.1.tar.gz": _ZEROS[:128],
             }, compress=True, root_dir="influxdb_backup_20260211_205958")
             self.assertTrue(validate_backup_archive(archive))
 